@@ -11,5 +11,5 @@ query = """
     where domain = 'CameraRollDomain' and relativePath like 'Media/DCIM/%.MOV'
 """
 
-content = Backup.parse(db.buffered_query(query), parse_metadata=True)
+content = Backup.parse(db.buffered_query(query))
 backup.export(content, 'tests/.data/exported_videos', restore_modified_dates=True)
@@ -56,10 +56,10 @@ def export(
         restore_symlinks: bool = False,
     ) -> None:
     backup = Backup(backup_path)
-    content = backup.get_content(domain_prefix, namespace_prefix,
-                                 path_prefix, parse_metadata=restore_modified_dates)
+    content = backup.get_content(domain_prefix, namespace_prefix, path_prefix)
     content_count = backup.get_content_count(domain_prefix, namespace_prefix, path_prefix)
-    backup.export(content, output_path, ignore_missing, restore_modified_dates, restore_symlinks, content_count)
+    backup.export(content, output_path, ignore_missing, restore_modified_dates, restore_symlinks, content_count,
+                  prefetch=True)
     backup.close()
     logging.info(f"{content_count} entries processed")
 
@@ -0,0 +1,142 @@
+"""
+Minimal reader of the binary property lists stored in Manifest.db.
+
+Each file record carries an NSKeyedArchiver archive of MBFile, where
+$objects[1] is the file's property dictionary. plistlib materializes
+every object of the archive, while export only needs a few properties,
+so this module navigates the binary format directly and decodes just them.
+"""
+import struct
+from typing import Iterator
+
+_HEADER = b"bplist00"
+_TRAILER = struct.Struct(">6xBBQQQ")
+
+
+def _encode_key(key: str) -> bytes:
+    """Encode a short ASCII string the way it is stored in a binary plist."""
+    return bytes([0x50 | len(key)]) + key.encode("ascii")
+
+
+_OBJECTS_KEY = _encode_key("$objects")
+_SIZE_KEY = _encode_key("Size")
+_LAST_MODIFIED_KEY = _encode_key("LastModified")
+_TARGET_KEY = _encode_key("Target")
+_PROPERTY_KEYS = {_SIZE_KEY: 0, _LAST_MODIFIED_KEY: 1, _TARGET_KEY: 2}
+
+
+# struct format characters of unsigned integers by size.
+_UINT_FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+
+class _BinaryPlist:
+    def __init__(self, blob: bytes):
+        if len(blob) < len(_HEADER) + _TRAILER.size or not blob.startswith(_HEADER):
+            raise ValueError("Not a binary plist")
+
+        offset_size, ref_size, num_objects, self.top, table_offset = \
+            _TRAILER.unpack_from(blob, len(blob) - _TRAILER.size)
+        try:
+            self._ref_format = _UINT_FORMATS[ref_size]
+            offset_format = _UINT_FORMATS[offset_size]
+        except KeyError:
+            raise ValueError("Unsupported integer size") from None
+
+        self.blob = blob
+        self.ref_size = ref_size
+        self.offsets = struct.unpack_from(f">{num_objects}{offset_format}", blob, table_offset)
+
+    def _marker(self, ref: int, kind: int) -> int:
+        """Get position of the object, checking its type marker."""
+        pos = self.offsets[ref]
+        if self.blob[pos] & 0xF0 != kind:
+            raise ValueError(f"Unexpected object type: {self.blob[pos]:#x}")
+        return pos
+
+    def _length(self, pos: int) -> tuple[int, int]:
+        """Get length of the object at pos and position of its content."""
+        length = self.blob[pos] & 0x0F
+        pos += 1
+        if length == 0x0F:
+            size = 1 << (self.blob[pos] & 0x0F)
+            length = int.from_bytes(self.blob[pos + 1:pos + 1 + size], "big")
+            pos += 1 + size
+        return length, pos
+
+    def _refs(self, pos: int, count: int) -> tuple[int, ...]:
+        """Read count object references starting at pos."""
+        return struct.unpack_from(f">{count}{self._ref_format}", self.blob, pos)
+
+    def dict_items(self, ref: int) -> Iterator[tuple[int, int]]:
+        """Iterate over (key, value) references of a dictionary."""
+        count, pos = self._length(self._marker(ref, 0xD0))
+        return zip(self._refs(pos, count), self._refs(pos + count * self.ref_size, count))
+
+    def array_item(self, ref: int, index: int) -> int:
+        """Get reference of the array element at index."""
+        count, pos = self._length(self._marker(ref, 0xA0))
+        if index >= count:
+            raise ValueError(f"Array index out of range: {index}")
+        return self._refs(pos + index * self.ref_size, 1)[0]
+
+    def key(self, ref: int) -> bytes:
+        """Get raw bytes of a short string object, comparable with _encode_key()."""
+        pos = self.offsets[ref]
+        return self.blob[pos:pos + 1 + (self.blob[pos] & 0x0F)]
+
+    def integer(self, ref: int) -> int:
+        pos = self._marker(ref, 0x10)
+        size = 1 << (self.blob[pos] & 0x0F)
+        return int.from_bytes(self.blob[pos + 1:pos + 1 + size], "big", signed=size >= 8)
+
+    def uid(self, ref: int) -> int:
+        pos = self._marker(ref, 0x80)
+        size = (self.blob[pos] & 0x0F) + 1
+        return int.from_bytes(self.blob[pos + 1:pos + 1 + size], "big")
+
+    def string(self, ref: int) -> str:
+        pos = self.offsets[ref]
+        kind = self.blob[pos] & 0xF0
+        length, pos = self._length(pos)
+        if kind == 0x50:
+            return self.blob[pos:pos + length].decode("ascii")
+        if kind == 0x60:
+            return self.blob[pos:pos + length * 2].decode("utf-16be")
+        raise ValueError(f"Unexpected object type: {kind:#x}")
+
+
+def extract_metadata(blob: bytes) -> tuple[int | None, int | None, str | None]:
+    """
+    Get size, last modified timestamp, and symbolic link target
+    from the metadata blob of a file record. Missing values are None.
+    Raises ValueError if the blob is not an archive of the expected shape.
+    """
+    try:
+        plist = _BinaryPlist(blob)
+
+        blob, offsets, key = plist.blob, plist.offsets, plist.key
+
+        for key_ref, value_ref in plist.dict_items(plist.top):
+            if key(key_ref) == _OBJECTS_KEY:
+                objects = value_ref
+                break
+        else:
+            raise ValueError("Archive has no $objects")
+
+        found = [None, None, None]
+        for key_ref, value_ref in plist.dict_items(plist.array_item(objects, 1)):
+            pos = offsets[key_ref]
+            index = _PROPERTY_KEYS.get(blob[pos:pos + 1 + (blob[pos] & 0x0F)])
+            if index is not None:
+                found[index] = value_ref
+
+        size_ref, last_modified_ref, target_ref = found
+        size = plist.integer(size_ref) if size_ref is not None else None
+        last_modified = plist.integer(last_modified_ref) if last_modified_ref is not None else None
+        target = (plist.string(plist.array_item(objects, plist.uid(target_ref)))
+                  if target_ref is not None else None)
+
+        return size, last_modified, target
+
+    except (IndexError, OverflowError, UnicodeDecodeError, struct.error) as e:
+        raise ValueError("Malformed binary plist") from e
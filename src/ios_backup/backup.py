@@ -1,13 +1,20 @@
 import os
+import sys
+import shutil
 import logging
 import plistlib
 import hashlib
-from typing import Iterable
-from functools import cache, cached_property
-from dataclasses import dataclass
+import queue
+import threading
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing, nullcontext
+from typing import Generator, Iterable
+from functools import cached_property
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from .db import BackupDB
+from ._fastplist import extract_metadata
 
 _FLAG_MAP = {
     1: "file",
@@ -15,8 +22,47 @@ _FLAG_MAP = {
     4: "symlink",
     10: "hardlink",
 }
+_FMT_BINARY = plistlib.FMT_BINARY
 
-@dataclass
+# copy_file_range() and sendfile() to a regular file are Linux-specific.
+_USE_COPY_FILE_RANGE = hasattr(os, "copy_file_range")
+_USE_SENDFILE = sys.platform.startswith("linux")
+_SENDFILE_CHUNK = 1 << 30
+_COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_MAX_PENDING_COPIES = _COPY_WORKERS * 4
+_PREFETCH_BATCH = 256
+_PREFETCH_DEPTH = 4
+_UTIME_DIR_FD = (os.utime in os.supports_dir_fd and os.utime in os.supports_follow_symlinks
+                 and hasattr(os, "O_DIRECTORY"))
+
+_NO_METADATA = (None, None, None)
+
+
+def _archive_metadata(archive: dict | None) -> tuple[int | None, int | None, str | None]:
+    """Get size, last modified timestamp, and symlink target from a parsed archive."""
+    try:
+        objects = archive["$objects"]
+        properties = objects[1]
+        target = properties.get("Target")
+        return (properties.get("Size"), properties.get("LastModified"),
+                objects[target.data] if target is not None else None)
+    except Exception:
+        return _NO_METADATA
+
+
+def _read_metadata(blob: bytes) -> tuple[int | None, int | None, str | None]:
+    """Get size, last modified timestamp, and symlink target from a metadata blob."""
+    try:
+        return extract_metadata(blob)
+    except Exception:
+        pass  # Unexpected layout, let plistlib handle it.
+    try:
+        return _archive_metadata(plistlib.loads(blob, fmt=_FMT_BINARY))
+    except Exception:
+        return _NO_METADATA
+
+
+@dataclass(slots=True)
 class Record:
     file_id: str
     domain: str
@@ -24,17 +70,186 @@ class Record:
     relative_path: str
     type: str
     data: dict | bytes | None
+    content_path: str = field(init=False)  # Path of the content in the backup.
+    _metadata: tuple | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.content_path = self.file_id[:2] + "/" + self.file_id
+
+    def _get_metadata(self) -> tuple[int | None, int | None, str | None]:
+        """
+        Lazy extract and return (size, last modified, symlink target) from data.
+        Never raises: values of a corrupt or unexpected blob are None, so that
+        reading them (e.g. in the export loop) cannot abort the caller.
+        """
+        if self._metadata is None:
+            try:
+                if isinstance(self.data, bytes):
+                    self._metadata = _read_metadata(self.data)
+                elif self.data:
+                    self._metadata = _archive_metadata(self.data)
+                else:
+                    self._metadata = _NO_METADATA
+            except Exception:
+                self._metadata = _NO_METADATA
+        return self._metadata
 
     @property
-    def content_path(self) -> str:
-        """Get the content path in the backup for this record."""
-        return Backup.get_src_path(self.file_id)
+    def size(self) -> int | None:
+        """File size on the device."""
+        return self._get_metadata()[0]
+
+    @property
+    def last_modified(self) -> int | None:
+        """Last modified date on the device, as POSIX timestamp."""
+        return self._get_metadata()[1]
+
+    @property
+    def symlink_target(self) -> str | None:
+        """Target of the symbolic link."""
+        return self._get_metadata()[2]
+
+
+def _parse(content: Iterable[tuple], parse_metadata: bool,
+           Record=Record, flag_map=_FLAG_MAP, loads=plistlib.loads,
+           fmt=_FMT_BINARY) -> Generator[Record, None, None]:
+    """Implementation of Backup.parse(); helpers are bound as default arguments (fast locals)."""
+    for id_, domain, path, flag, data in content:
+        domain, _, sub = domain.partition("-")  # TODO: handle multiple "-"
+
+        if parse_metadata and data:
+            try:
+                data = loads(data, fmt=fmt)
+            except Exception:
+                data = {}
+
+        yield Record(id_, domain, sub, path, flag_map[flag], data)
+
+
+def _fast_copy(src: str | Path, dst: str | Path) -> None:
+    """
+    Copy file content from src to dst. On Linux, the data is moved by the kernel:
+    copy_file_range() lets copy-on-write file systems (Btrfs, XFS) share extents
+    instead of copying data, sendfile() at least avoids userspace buffers.
+    """
+    if _USE_COPY_FILE_RANGE or _USE_SENDFILE:
+        with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+
+            if _USE_COPY_FILE_RANGE:
+                try:
+                    size = os.fstat(src_fd).st_size
+                    offset = 0
+                    # Explicit offsets leave file positions intact for the fallback.
+                    while offset < size and (
+                        copied := os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+                    ):
+                        offset += copied
+                    if offset >= size:
+                        return
+                    # Some file systems report 0 bytes copied instead of an error.
+                except OSError:
+                    pass  # E.g. old kernel or cross-device copy.
+
+            if _USE_SENDFILE:
+                try:
+                    offset = 0
+                    while sent := os.sendfile(dst_fd, src_fd, offset, _SENDFILE_CHUNK):
+                        offset += sent
+                    return
+                except OSError:
+                    pass  # Not supported by the file system, use regular copy.
+
+    shutil.copyfile(src, dst)
+
+
+def _prefetch(items: Iterable, batch_size: int = _PREFETCH_BATCH,
+              depth: int = _PREFETCH_DEPTH) -> Generator:
+    """
+    Iterate over items produced by a background thread, so that producing them
+    (e.g. reading rows from the database) overlaps with their consumption.
+    Items are passed in batches through a bounded queue.
+    """
+    batches = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    error = None
+
+    def put(batch: list) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(batch, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        nonlocal error
+        batch = []
+        try:
+            for item in items:
+                batch.append(item)
+                if len(batch) == batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+            if batch:
+                put(batch)
+        except Exception as e:
+            error = e
+            if batch:
+                put(batch)  # Items read before the error are still consumed.
+        put([])  # End of items.
+
+    producer = threading.Thread(target=produce, name="ios_backup-prefetch", daemon=True)
+    producer.start()
+    try:
+        while batch := batches.get():
+            yield from batch
+        if error is not None:
+            raise error
+    finally:
+        stop.set()
+        producer.join()
+
+
+def _restore_file_dates(file_dates: dict[str | Path, list[tuple[str, int | None]]]) -> None:
+    """
+    Restore modified dates of files, given as (name, mtime) lists per directory.
+    Each directory is opened once, and dates are set relative to its descriptor,
+    so the kernel does not resolve the full path of every file.
+    """
+    for dir_path, entries in file_dates.items():
+        dir_fd = None
+        if _UTIME_DIR_FD:
+            try:
+                dir_fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+            except OSError:
+                pass  # Fall back to full paths.
+
+        try:
+            for name, mtime in entries:
+                try:
+                    if dir_fd is None:
+                        os.utime(os.path.join(dir_path, name), (mtime, mtime),
+                                 follow_symlinks=False)
+                    else:
+                        os.utime(name, (mtime, mtime), dir_fd=dir_fd, follow_symlinks=False)
+                except Exception:
+                    logging.warning("Failed to restore modified date for "
+                                    f"{os.path.join(dir_path, name)}")
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
 
 
 class Backup:
     def __init__(self, backup_path: str):
         self.base_path = Path(backup_path)
         self._db: BackupDB | None = None
+        self._count_cache: dict[tuple[str, str, str], int] = {}
+        # SHA-1 states with the domain part of file IDs already hashed.
+        self._sha1_bases: dict[str, "hashlib._Hash"] = {}
     
     @property
     def db(self) -> BackupDB:
@@ -42,91 +257,147 @@ class Backup:
             self._db = BackupDB(f"{self.base_path}/Manifest.db")
         return self._db
     
-    @cache
+    @cached_property
     def all_domains(self) -> list[str]:
-        """Fetch all distinct domains from the backup."""
+        """Lazy fetch and return all distinct domains from the backup."""
         return self.db.get_all_domains()
     
     @staticmethod
     def parse(content: Iterable[tuple], parse_metadata: bool = False) -> Iterable[Record]:
-        for id_, domain, path, flag, data in content:
-            if "-" in domain:
-                domain, sub = domain.split("-", 1)  # TODO: handle multiple "-"
-            else:
-                domain, sub = domain, ""
-
-            if parse_metadata and data:
-                try:
-                    data = plistlib.loads(data, fmt=plistlib.FMT_BINARY)
-                except Exception:
-                    data = {}
-
-            yield Record(id_, domain, sub, path, _FLAG_MAP[flag], data)
+        """
+        Convert raw rows of the Files table into records.
+        Size, modified date, and symlink target are extracted on first access.
+        With parse_metadata, data is replaced with the entire parsed plist.
+        """
+        return _parse(content, parse_metadata)
 
     def get_content(self, domain_prefix: str = "", namespace_prefix: str = "",
-                    path_prefix: str = "", parse_metadata: bool = False) -> Iterable[Record]:
-        """Fetch content records based on filters."""
+                    path_prefix: str = "", parse_metadata: bool = False,
+                    order_by_file_id: bool = False) -> Iterable[Record]:
+        """
+        Fetch content records based on filters.
+        Ordering by file ID makes export read the backup directory by directory,
+        but SQLite has to sort all matching rows before returning the first one.
+        """
 
-        content = self.db.get_content(domain_prefix, namespace_prefix, path_prefix)
+        content = self.db.get_content(domain_prefix, namespace_prefix, path_prefix,
+                                      order_by_file_id)
         return self.parse(content, parse_metadata)
 
-    @cache
     def get_content_count(self, domain_prefix: str = "", namespace_prefix: str = "",
                           path_prefix: str = "") -> int:
         """Count content records based on filters."""
         
-        return self.db.get_content_count(domain_prefix, namespace_prefix, path_prefix)
+        key = (domain_prefix, namespace_prefix, path_prefix)
+        if key not in self._count_cache:
+            self._count_cache[key] = self.db.get_content_count(*key)
+        return self._count_cache[key]
     
     def export(self, content: Iterable[Record], path: str,
                ignore_missing: bool = False, restore_modified_dates: bool = False,
                restore_symlinks: bool = False,
-               total_count: int | None = None) -> None:
-        """Export the given content records to the specified path."""
+               total_count: int | None = None, prefetch: bool = False) -> None:
+        """
+        Export the given content records to the specified path.
+        With prefetch, content is iterated in a background thread,
+        so it must not come from a thread-bound sqlite3 connection.
+        """
         export_path = Path(path)
         export_path.mkdir(parents=True, exist_ok=True)
+        # Paths in the loop are plain strings, Path objects are costly to create per record.
+        export_base = str(export_path)
+        base_path = str(self.base_path)
 
+        if prefetch:
+            # Database reads run in a separate thread, overlapping with file I/O.
+            content = prefetched = _prefetch(content)
+            stop_prefetch = closing(prefetched)
+        else:
+            stop_prefetch = nullcontext()
+
+        progress = None
         if total_count:
             try:
                 from tqdm import tqdm
-                content = tqdm(content, total=total_count, desc="Exporting files")
+                progress = tqdm(total=total_count, desc="Exporting files")
             except ImportError:
                 pass
 
         directories_created = []
+        file_dates: dict[str, list[tuple[str, int | None]]] = {}
+        copies = set()
+        created_dirs: set[str] = set()
 
-        for record in content:
-            dest_path = export_path / record.domain / record.subdomain / record.relative_path
+        def drain(return_when: str) -> None:
+            """Wait for copies in flight, propagating errors from the workers."""
+            nonlocal copies
+            done, copies = wait(copies, return_when=return_when)
+            try:
+                for copy in done:
+                    copy.result()
+            except BaseException:
+                for copy in copies:
+                    copy.cancel()
+                raise
+            if progress is not None:
+                progress.update(len(done))
 
-            if record.type == "directory":
-                dest_path.mkdir(parents=True, exist_ok=True)
+        def make_dirs(directory: str) -> None:
+            """Create directory with parents, skipping those created before."""
+            if directory not in created_dirs:
+                os.makedirs(directory, exist_ok=True)
+                while directory not in created_dirs:
+                    created_dirs.add(directory)
+                    directory = os.path.dirname(directory)
 
-            elif record.type == "file":
-                src_path = Path(self.base_path) / self.get_src_path(record.file_id)
-                if not src_path.exists():
-                    if ignore_missing:
-                        continue
-                    else:
-                        raise FileNotFoundError(f"Source file not found: {src_path}")
-                dest_path.parent.mkdir(parents=True, exist_ok=True)
-                src_path.copy(dest_path)
-            
-            elif record.type == "symlink" and restore_symlinks:
-                dest_path.parent.mkdir(parents=True, exist_ok=True)
-                index = record.data['$objects'][1]['Target'].data
-                link_target = record.data['$objects'][index]
-                dest_path.symlink_to(link_target)
-            
-            if restore_modified_dates:
-                try:
-                    mtime = record.data["$objects"][1]["LastModified"]
+        # Files are copied in worker threads, so that I/O of many small files overlaps.
+        # The number of copies in flight is bounded, so that memory use does not grow
+        # with the size of the backup, and a failed copy stops the export early.
+        with ThreadPoolExecutor(max_workers=_COPY_WORKERS) as executor, stop_prefetch:
+            for record in content:
+                dest_path = os.path.join(export_base, record.domain, record.subdomain,
+                                         record.relative_path)
+
+                if record.type == "directory":
+                    make_dirs(dest_path)
+
+                elif record.type == "file":
+                    src_path = base_path + "/" + record.content_path
+                    if not os.path.exists(src_path):
+                        if ignore_missing:
+                            if progress is not None:
+                                progress.update()
+                            continue
+                        else:
+                            raise FileNotFoundError(f"Source file not found: {src_path}")
+                    make_dirs(os.path.dirname(dest_path))
+                    if len(copies) >= _MAX_PENDING_COPIES:
+                        drain(FIRST_COMPLETED)
+                    copies.add(executor.submit(_fast_copy, src_path, dest_path))
+
+                elif record.type == "symlink" and restore_symlinks:
+                    make_dirs(os.path.dirname(dest_path))
+                    os.symlink(record.symlink_target, dest_path)
+
+                if restore_modified_dates:
+                    # Postpone setting dates until all files are created.
                     if record.type == "directory":
-                        # Postpone setting directory mtime until all files are created.
-                        directories_created.append((dest_path, mtime))
+                        directories_created.append((dest_path, record.last_modified))
                     else:
-                        os.utime(dest_path, (mtime, mtime), follow_symlinks=False)
-                except Exception:
-                    logging.warning(f"Failed to restore modified date for {dest_path}")
-        
+                        dir_path, name = os.path.split(dest_path)
+                        file_dates.setdefault(dir_path, []).append((name, record.last_modified))
+
+                # Files are counted in progress when their copy completes.
+                if progress is not None and record.type != "file":
+                    progress.update()
+
+            drain(ALL_COMPLETED)
+
+        if progress is not None:
+            progress.close()
+
+        _restore_file_dates(file_dates)
+
         try:
             if directories_created:
                 directories_created = tqdm(directories_created, desc="Restoring directory dates")
@@ -194,7 +465,11 @@ class Backup:
         This method bypasses the manifest database,
         hence will work with corrupted or incomplete backups.
         """
-        namespaced_path = f"{domain}-{relative_path}"
-        file_id = hashlib.sha1(namespaced_path.encode()).hexdigest()
+        base = self._sha1_bases.get(domain)
+        if base is None:
+            base = self._sha1_bases[domain] = hashlib.sha1(f"{domain}-".encode())
+        sha1 = base.copy()
+        sha1.update(relative_path.encode())
+        file_id = sha1.hexdigest()
 
         return self.get_file_by_id(file_id)
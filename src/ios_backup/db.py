@@ -1,55 +1,105 @@
 import sqlite3
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Sequence
+
+
+# Connection tuning for the read-only workload: memory-mapped I/O,
+# 64 MiB page cache, and in-memory temporary tables (e.g. for sorting).
+# Manifest.db is never modified, query_only protects the backup.
+# (Opening with mode=ro is not an option, as Manifest.db uses WAL journal,
+# and a read-only connection cannot remove -wal and -shm files on close.)
+_PRAGMAS = (
+    "PRAGMA query_only = ON",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+def _prefix_range(prefix: str) -> tuple[str, str | None]:
+    """
+    Get half-open bounds [lower, upper) matching all strings starting with prefix.
+    Range predicates, unlike LIKE, are served by the indexes of Manifest.db.
+    Upper bound is the shortest string greater than all strings with the prefix:
+    trailing U+10FFFF characters are dropped, as they cannot be incremented,
+    and the surrogate range (which sqlite3 cannot bind) is skipped.
+    It is None only if the prefix consists of U+10FFFF characters.
+    """
+    stem = prefix.rstrip("\U0010ffff")
+    if not stem:
+        return prefix, None
+    code = ord(stem[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return prefix, stem[:-1] + chr(code)
+
+
+def _prefix_condition(column: str, prefix: str) -> tuple[str, tuple]:
+    """Build SQL condition and its parameters matching column values starting with prefix."""
+    lower, upper = _prefix_range(prefix)
+    if upper is None:
+        return f" AND {column} >= ?", (lower,)
+    return f" AND {column} >= ? AND {column} < ?", (lower, upper)
 
 
 class QueryBuilder:
-    @staticmethod
-    def content(domain_prefix: str = "", namespace_prefix: str = "", path_prefix: str = "") -> str:
-        """Build SQL query to fetch files based on domain and path prefix."""
+    _NAMESPACE = "substr(domain, instr(domain, '-') + 1)"
+
+    @classmethod
+    def content(cls, domain_prefix: str = "", namespace_prefix: str = "",
+                path_prefix: str = "", order_by_file_id: bool = False) -> tuple[str, tuple]:
+        """
+        Build SQL query and its parameters to fetch files based on domain and path prefix.
+        Ordering by file ID returns files in the order of their location in the backup.
+        """
 
         query = f"""
             SELECT fileID, domain, relativePath, flags, file
             FROM Files
             WHERE 1 = 1
         """
+        params = ()
+
+        if domain_prefix:
+            condition, condition_params = _prefix_condition("domain", domain_prefix)
+            query += condition
+            params += condition_params
 
         if namespace_prefix:
-            query += f" AND domain LIKE '{domain_prefix}%-{namespace_prefix}%'"
-        elif domain_prefix:
-            query += f" AND domain LIKE '{domain_prefix}%'"
-        
+            condition, condition_params = _prefix_condition(cls._NAMESPACE, namespace_prefix)
+            query += " AND instr(domain, '-') > 0" + condition
+            params += condition_params
+
         if path_prefix:
-            query += f" AND relativePath LIKE '{path_prefix}%'"
+            condition, condition_params = _prefix_condition("relativePath", path_prefix)
+            query += condition
+            params += condition_params
+
+        if order_by_file_id:
+            query += " ORDER BY fileID"
 
-        return query
+        return query, params
     
     @classmethod
     def content_count(cls, domain_prefix: str, namespace_prefix: str = "",
-                      path_prefix: str = "") -> str:
-        """Build SQL query to count files based on domain and path prefix."""
+                      path_prefix: str = "") -> tuple[str, tuple]:
+        """Build SQL query and its parameters to count files based on domain and path prefix."""
 
+        content_query, params = cls.content(domain_prefix, namespace_prefix, path_prefix)
         query = f"""
             SELECT COUNT(*)
             FROM (
-                {cls.content(domain_prefix, namespace_prefix, path_prefix)}
+                {content_query}
             )
         """
 
-        return query
+        return query, params
     
     @staticmethod
     def all_domains() -> str:
-        """Build SQL query to fetch all distinct domains."""
-
-        return """
-            select distinct
-                case when instr(domain, '-') > 0 then
-                    substr(domain, 1, instr(domain, '-') - 1)
-                    else domain
-                end as domain
-            from Files;
-        """
+        """Build SQL query to fetch all distinct raw domains (with namespaces)."""
+
+        return "SELECT DISTINCT domain FROM Files"
 
 class BackupDB:
     def __init__(self, db_path: str | Path):
@@ -59,38 +109,39 @@ class BackupDB:
         if not db_path.exists():
             raise FileNotFoundError(f"Database file not found: {db_path}")
         
-        self.conn = sqlite3.connect(db_path)
+        # The connection may be read from a prefetching thread during export.
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        for pragma in _PRAGMAS:
+            self.conn.execute(pragma)
     
-    def simple_query(self, query: str) -> list[tuple]:
+    def simple_query(self, query: str, params: Sequence = ()) -> list[tuple]:
         """Execute a simple SQL query and return all results."""
         cursor = self.conn.cursor()
-        cursor.execute(query)
+        cursor.execute(query, params)
         return cursor.fetchall()
     
-    def buffered_query(self, query: str, buffer_size: int = 1000) -> Iterable[tuple]:
-        """Execute the given SQL query and yield results in buffered chunks."""
+    def buffered_query(self, query: str, buffer_size: int = 1000,
+                       params: Sequence = ()) -> Iterable[tuple]:
+        """Execute the given SQL query and stream results from the cursor."""
         cursor = self.conn.cursor()
-        cursor.execute(query)
-        while True:
-            records = cursor.fetchmany(buffer_size)
-            if not records:
-                break
-            for record in records:
-                yield record
+        cursor.arraysize = buffer_size
+        cursor.execute(query, params)
+        yield from cursor
 
     def get_content(self, domain_prefix: str = "", namespace_prefix: str = "",
-                    path_prefix: str = "") -> Iterable[tuple]:
+                    path_prefix: str = "", order_by_file_id: bool = False) -> Iterable[tuple]:
         """Fetch content records based on filters."""
-        query = QueryBuilder.content(domain_prefix, namespace_prefix, path_prefix)
-        return self.buffered_query(query)
+        query, params = QueryBuilder.content(domain_prefix, namespace_prefix, path_prefix,
+                                             order_by_file_id)
+        return self.buffered_query(query, params=params)
     
     def get_content_count(self, domain_prefix: str = "", namespace_prefix: str = "",
                           path_prefix: str = "") -> int:
         """Count content records based on filters."""
 
-        query = QueryBuilder.content_count(domain_prefix, namespace_prefix, path_prefix)
+        query, params = QueryBuilder.content_count(domain_prefix, namespace_prefix, path_prefix)
         cursor = self.conn.cursor()
-        cursor.execute(query)
+        cursor.execute(query, params)
         count = cursor.fetchone()[0]
         return count
 
@@ -99,7 +150,8 @@ class BackupDB:
         query = QueryBuilder.all_domains()
         cursor = self.conn.cursor()
         cursor.execute(query)
-        domains = [row[0] for row in cursor.fetchall()]
+        # Strip namespaces here, rather than with string functions on every row in SQL.
+        domains = sorted({domain.partition("-")[0] for domain, in cursor})
         return domains
     
     def close(self) -> None:
@@ -0,0 +1,9 @@
+import pytest
+
+from ios_backup.__main__ import build_parser
+
+
+@pytest.fixture(scope="session")
+def cli_parser():
+    """Argument parser of the CLI, built once per session (parsing does not modify it)."""
+    return build_parser()
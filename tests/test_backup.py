@@ -1,9 +1,14 @@
 import hashlib
 import os
-import shutil
 import plistlib
+import sqlite3
+import sys
+import types
 from pathlib import Path
-from ios_backup.backup import Backup, Record
+
+import pytest
+
+from ios_backup.backup import Backup, Record, _fast_copy, _prefetch, _restore_file_dates
 
 
 def create_src_file(backup_dir: Path, domain: str, relative_path: str, content: bytes = b"hello"):
@@ -31,6 +36,7 @@ def test_parse_with_metadata():
     assert len(records) == 1
     r = records[0]
     assert r.file_id == "id1"
+    assert r.content_path == "id/id1"
     assert r.domain == "AppDomain"
     assert r.subdomain == "com.example"
     assert r.relative_path == "path/to/file"
@@ -40,6 +46,47 @@ def test_parse_with_metadata():
     assert r.data["Value"] == 42
 
 
+def test_parse_without_metadata():
+    blob = plistlib.dumps({"Name": "example"}, fmt=plistlib.FMT_BINARY)
+    content = [
+        ("id1", "HomeDomain", "Library", 2, blob),
+        ("id2", "AppDomain-com.example", "", 4, None),
+    ]
+    records = list(Backup.parse(content))
+
+    assert [r.domain for r in records] == ["HomeDomain", "AppDomain"]
+    assert [r.subdomain for r in records] == ["", "com.example"]
+    assert [r.type for r in records] == ["directory", "symlink"]
+    assert records[0].data == blob
+
+
+def test_parse_metadata_fields():
+    archive = {
+        "$objects": [
+            "$null",
+            {"Size": 1562, "LastModified": 1682109153, "Target": plistlib.UID(2)},
+            "/var/db/target",
+        ],
+    }
+    blob = plistlib.dumps(archive, fmt=plistlib.FMT_BINARY)
+    content = [("id1", "HomeDomain", "link", 4, blob)]
+
+    lazy = next(Backup.parse(content))
+    full = next(Backup.parse(content, parse_metadata=True))
+
+    for r in (lazy, full):
+        assert r.size == 1562
+        assert r.last_modified == 1682109153
+        assert r.symlink_target == "/var/db/target"
+    assert lazy.data == blob
+    assert full.data == archive
+
+
+def test_metadata_of_record_without_data():
+    r = Record("id1", "HomeDomain", "", "file", "file", None)
+    assert (r.size, r.last_modified, r.symlink_target) == (None, None, None)
+
+
 def test_get_file_found_and_not_found(tmp_path):
     backup_dir = tmp_path / "backup"
     backup_dir.mkdir()
@@ -60,7 +107,6 @@ def test_get_file_found_and_not_found(tmp_path):
         missing_backup = Backup(str(tmp_path / "empty_backup"))
         (tmp_path / "empty_backup").mkdir()
 
-        import pytest
         with pytest.raises(FileNotFoundError):
             missing_backup.get_file_by_path(domain, rel_path)
     finally:
@@ -69,6 +115,19 @@ def test_get_file_found_and_not_found(tmp_path):
     b.close()
 
 
+def test_get_file_by_path_same_domain(tmp_path):
+    backup_dir = tmp_path / "backup"
+    backup_dir.mkdir()
+
+    _, first = create_src_file(backup_dir, "MyDomain", "a.txt", b"a")
+    _, second = create_src_file(backup_dir, "MyDomain", "b.txt", b"b")
+
+    b = Backup(str(backup_dir))
+    assert b.get_file_by_path("MyDomain", "a.txt") == first
+    assert b.get_file_by_path("MyDomain", "b.txt") == second
+    b.close()
+
+
 def test__read_plist_and_cached_properties(tmp_path):
     backup_dir = tmp_path / "backup_plists"
     backup_dir.mkdir()
@@ -77,12 +136,9 @@ def test__read_plist_and_cached_properties(tmp_path):
     manifest = {"Version": 1}
     status = {"Status": "ok"}
 
-    with (backup_dir / "Info.plist").open("wb") as f:
-        plistlib.dump(info, f)
-    with (backup_dir / "Manifest.plist").open("wb") as f:
-        plistlib.dump(manifest, f, fmt=plistlib.FMT_BINARY)
-    with (backup_dir / "Status.plist").open("wb") as f:
-        plistlib.dump(status, f, fmt=plistlib.FMT_BINARY)
+    (backup_dir / "Info.plist").write_bytes(plistlib.dumps(info))
+    (backup_dir / "Manifest.plist").write_bytes(plistlib.dumps(manifest, fmt=plistlib.FMT_BINARY))
+    (backup_dir / "Status.plist").write_bytes(plistlib.dumps(status, fmt=plistlib.FMT_BINARY))
 
     b = Backup(str(backup_dir))
 
@@ -92,14 +148,13 @@ def test__read_plist_and_cached_properties(tmp_path):
     assert b.status["Status"] == "ok"
 
     # Cached properties: change file on disk and ensure property doesn't change
-    with (backup_dir / "Info.plist").open("wb") as f:
-        plistlib.dump({"DeviceName": "Changed"}, f)
+    (backup_dir / "Info.plist").write_bytes(plistlib.dumps({"DeviceName": "Changed"}))
     assert b.info["DeviceName"] == "iPhone"
 
     b.close()
 
 
-def test_export_file_copy_and_ignore_missing(tmp_path, monkeypatch):
+def test_export_file_copy_and_ignore_missing(tmp_path):
     backup_dir = tmp_path / "backup_export"
     backup_dir.mkdir()
 
@@ -111,14 +166,6 @@ def test_export_file_copy_and_ignore_missing(tmp_path, monkeypatch):
 
     file_id, src_path = create_src_file(backup_dir, domain, rel_path, b"exported")
 
-    # Ensure Path.copy exists by monkeypatching it to use shutil.copy
-    from pathlib import Path as _Path
-
-    def _copy(self, dest):
-        shutil.copy(self, dest)
-
-    monkeypatch.setattr(_Path, "copy", _copy, raising=False)
-
     # Build Record and run export
     record = Record(file_id, domain, subdomain, rel_path, "file", None)
     b = Backup(str(backup_dir))
@@ -137,3 +184,164 @@ def test_export_file_copy_and_ignore_missing(tmp_path, monkeypatch):
     b.export([missing_record], str(out_dir), ignore_missing=True)
 
     b.close()
+
+
+def test_export_stops_on_failed_copy(tmp_path, monkeypatch):
+    backup_dir = tmp_path / "backup"
+    backup_dir.mkdir()
+    file_id, _ = create_src_file(backup_dir, "HomeDomain", "a.txt", b"a")
+
+    def failing_copy(src, dst):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr("ios_backup.backup._fast_copy", failing_copy)
+    monkeypatch.setattr("ios_backup.backup._MAX_PENDING_COPIES", 2)
+
+    consumed = 0
+
+    def records():
+        nonlocal consumed
+        for i in range(1000):
+            consumed += 1
+            yield Record(file_id, "HomeDomain", "", f"{i}.txt", "file", None)
+
+    b = Backup(str(backup_dir))
+    with pytest.raises(OSError, match="No space left"):
+        b.export(records(), str(tmp_path / "out"))
+    assert consumed < 1000
+
+
+def test_export_progress_counts_completed_copies(tmp_path, monkeypatch):
+    updates = []
+
+    class FakeTqdm:
+        def __init__(self, iterable=None, total=None, desc=None):
+            self.iterable = iterable
+
+        def __iter__(self):
+            return iter(self.iterable)
+
+        def update(self, n=1):
+            updates.append(n)
+
+        def close(self):
+            pass
+
+    monkeypatch.setitem(sys.modules, "tqdm", types.SimpleNamespace(tqdm=FakeTqdm))
+
+    backup_dir = tmp_path / "backup"
+    backup_dir.mkdir()
+    file_id, _ = create_src_file(backup_dir, "HomeDomain", "a.txt", b"a")
+    missing_id = hashlib.sha1(b"HomeDomain-missing.txt").hexdigest()
+    records = [
+        Record("dir", "HomeDomain", "", "docs", "directory", None),
+        *(Record(file_id, "HomeDomain", "", f"docs/{i}.txt", "file", None) for i in range(10)),
+        Record(missing_id, "HomeDomain", "", "missing.txt", "file", None),
+    ]
+
+    b = Backup(str(backup_dir))
+    b.export(records, str(tmp_path / "out"), ignore_missing=True, total_count=len(records))
+    assert sum(updates) == len(records)
+
+
+def test_export_with_corrupt_metadata(tmp_path, caplog):
+    backup_dir = tmp_path / "backup"
+    backup_dir.mkdir()
+    file_id, _ = create_src_file(backup_dir, "HomeDomain", "a.txt", b"a")
+
+    blob = plistlib.dumps({"$objects": ["$null", {"LastModified": 1}]}, fmt=plistlib.FMT_BINARY)
+    record = Record(file_id, "HomeDomain", "", "a.txt", "file", blob[:-8] + b"\xff" * 8)
+    assert record.last_modified is None
+
+    b = Backup(str(backup_dir))
+    b.export([record], str(tmp_path / "out"), restore_modified_dates=True)
+
+    assert (tmp_path / "out" / "HomeDomain" / "a.txt").read_bytes() == b"a"
+    assert "Failed to restore modified date" in caplog.text
+
+
+def test_export_from_thread_bound_cursor(tmp_path):
+    # A plain connection may only be used in the thread that created it.
+    conn = sqlite3.connect("tests/data/sample_backup/Manifest.db")
+    rows = conn.execute("SELECT fileID, domain, relativePath, flags, file FROM Files")
+
+    b = Backup("tests/data/sample_backup")
+    b.export(Backup.parse(rows), str(tmp_path), restore_modified_dates=True)
+    conn.close()
+
+    exported = tmp_path / "AppDomain/com.google.Translate/Library/Preferences/com.google.Translate.plist"
+    assert exported.read_bytes() == (
+        b.base_path / "12/12e90d5b620bbdeaaa88de34607ebf880fa708f5").read_bytes()
+
+
+def test_fast_copy(tmp_path):
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "dst.bin"
+    payload = os.urandom(1 << 20) + b"tail"
+    src.write_bytes(payload)
+    dst.write_bytes(b"previous content that is longer" * 100000)
+
+    _fast_copy(src, dst)
+    assert dst.read_bytes() == payload
+
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    _fast_copy(empty, dst)
+    assert dst.read_bytes() == b""
+
+
+def test_fast_copy_falls_back_when_nothing_copied(tmp_path, monkeypatch):
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "dst.bin"
+    src.write_bytes(b"x" * 1000)
+
+    monkeypatch.setattr(os, "copy_file_range", lambda *args: 0, raising=False)
+    _fast_copy(src, dst)
+    assert dst.read_bytes() == b"x" * 1000
+
+
+def test_restore_file_dates(tmp_path, caplog):
+    (tmp_path / "a.txt").write_bytes(b"a")
+    (tmp_path / "b.txt").write_bytes(b"b")
+
+    _restore_file_dates({tmp_path: [("a.txt", 1631511118), ("missing.txt", 1), ("b.txt", 1682109153)]})
+
+    assert (tmp_path / "a.txt").stat().st_mtime == 1631511118
+    assert (tmp_path / "b.txt").stat().st_mtime == 1682109153
+    assert "missing.txt" in caplog.text
+
+
+def test_all_domains_and_content_count_are_cached():
+    b = Backup("tests/data/sample_backup")
+
+    assert b.all_domains == ["AppDomain", "DatabaseDomain"]
+    assert b.all_domains is b.all_domains
+
+    assert b.get_content_count("AppDomain") == 5
+    b.db.close()
+    # Served from the cache, without touching the closed connection.
+    assert b.get_content_count("AppDomain") == 5
+
+
+def test_prefetch():
+    assert list(_prefetch(range(1000), batch_size=7, depth=2)) == list(range(1000))
+    assert list(_prefetch([])) == []
+
+
+def test_prefetch_propagates_errors_and_stops_on_close():
+    def failing():
+        yield 1
+        raise ValueError("broken row")
+
+    with pytest.raises(ValueError, match="broken row"):
+        list(_prefetch(failing(), batch_size=1))
+
+    consumed = []
+    with pytest.raises(ValueError, match="broken row"):
+        for item in _prefetch(failing(), batch_size=10):
+            consumed.append(item)
+    assert consumed == [1]
+
+    consumed = _prefetch(iter(range(10**6)), batch_size=1, depth=1)
+    assert next(consumed) == 0
+    consumed.close()  # Must not hang on the blocked producer.
@@ -50,6 +50,13 @@ class TestBackupDB:
         with pytest.raises(FileNotFoundError):
             BackupDB("nonexistent.db")
 
+    def test_init_opens_read_only(self, sample_db):
+        """Test that the database cannot be modified through BackupDB."""
+        db = BackupDB(sample_db)
+        with pytest.raises(sqlite3.OperationalError):
+            db.conn.execute("DELETE FROM Files")
+        db.close()
+
     def test_simple_query(self, sample_db):
         """Test simple query execution."""
         db = BackupDB(sample_db)
@@ -60,6 +67,13 @@ class TestBackupDB:
         assert results[-1][0] == 'file4'  # Check last record
         db.close()
 
+    def test_simple_query_with_params(self, sample_db):
+        """Test simple query execution with bound parameters."""
+        db = BackupDB(sample_db)
+        results = db.simple_query("SELECT fileID FROM Files WHERE domain = ?", ('MediaDomain',))
+        assert results == [('file3',)]
+        db.close()
+
     def test_buffered_query(self, sample_db):
         """Test buffered query execution with small buffer size."""
         db = BackupDB(sample_db)
@@ -93,6 +107,42 @@ class TestBackupDB:
         assert all('com.example' in row[1] for row in results)
         db.close()
 
+    def test_get_content_with_namespace_prefix_only(self, sample_db):
+        """Test get_content with namespace prefix filter and no domain."""
+        db = BackupDB(sample_db)
+        results = list(db.get_content(namespace_prefix='sett'))
+        assert [row[0] for row in results] == ['file4']
+        db.close()
+
+    def test_get_content_prefix_is_literal(self, sample_db):
+        """Test that LIKE wildcards in filter values are matched literally."""
+        db = BackupDB(sample_db)
+        assert list(db.get_content(domain_prefix='%Domain')) == []
+        assert list(db.get_content(path_prefix='docs_')) == []
+        db.close()
+
+    def test_get_content_prefix_at_max_character(self, sample_db):
+        """Test prefixes ending with a character that cannot be simply incremented."""
+        conn = sqlite3.connect(sample_db)
+        conn.executemany(
+            "INSERT INTO Files (fileID, domain, relativePath, flags, file) VALUES (?, ?, ?, ?, ?)",
+            [
+                ('file5', 'HomeDomain', 'docs/\U0010ffffx', 1, b''),
+                ('file6', 'HomeDomain', 'docs0', 1, b''),  # Sorts higher, does not match.
+                ('file7', 'HomeDomain', 'docs\ud7ffx', 1, b''),
+                ('file8', 'HomeDomain', 'docs\ue000', 1, b''),  # Sorts higher, does not match.
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        db = BackupDB(sample_db)
+        for prefix, expected in (('docs/\U0010ffff', 'file5'), ('docs\ud7ff', 'file7')):
+            results = list(db.get_content(path_prefix=prefix))
+            assert all(row[2].startswith(prefix) for row in results)
+            assert [row[0] for row in results] == [expected]
+        db.close()
+
     def test_get_content_with_path_prefix(self, sample_db):
         """Test get_content with path prefix filter."""
         db = BackupDB(sample_db)
@@ -101,6 +151,13 @@ class TestBackupDB:
         assert all(row[2].startswith('docs/') for row in results)
         db.close()
 
+    def test_get_content_order_by_file_id(self, sample_db):
+        """Test content records are returned ordered by file ID on request."""
+        db = BackupDB(sample_db)
+        rows = db.get_content(order_by_file_id=True)
+        assert [row[0] for row in rows] == sorted(row[0] for row in SAMPLE_DATA)
+        db.close()
+
     def test_get_content_count(self, sample_db):
         """Test get_content_count with various filters."""
         db = BackupDB(sample_db)
@@ -123,7 +180,7 @@ class TestBackupDB:
         
         # Expected unique domains (without namespace part)
         expected_domains = {'AppDomain', 'MediaDomain', 'HomeDomain'}
-        assert set(domains) == expected_domains
+        assert domains == sorted(expected_domains)
         db.close()
 
     def test_close_connection(self, sample_db):
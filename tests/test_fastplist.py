@@ -0,0 +1,66 @@
+import plistlib
+import sqlite3
+
+import pytest
+from ios_backup._fastplist import extract_metadata
+
+
+def archive_blob(properties: dict, *extra_objects) -> bytes:
+    archive = {
+        "$version": 100000,
+        "$archiver": "NSKeyedArchiver",
+        "$top": {"root": plistlib.UID(1)},
+        "$objects": ["$null", properties, *extra_objects],
+    }
+    return plistlib.dumps(archive, fmt=plistlib.FMT_BINARY)
+
+
+def test_sample_backup_matches_plistlib():
+    conn = sqlite3.connect("tests/data/sample_backup/Manifest.db")
+    blobs = [row[0] for row in conn.execute("SELECT file FROM Files")]
+    conn.close()
+
+    assert blobs
+    for blob in blobs:
+        objects = plistlib.loads(blob)["$objects"]
+        properties = objects[1]
+        target = properties.get("Target")
+        expected = (
+            properties["Size"],
+            properties["LastModified"],
+            objects[target.data] if target is not None else None,
+        )
+        assert extract_metadata(blob) == expected
+
+
+def test_large_values_and_unicode_target():
+    blob = archive_blob(
+        {"Size": 5 * 2**40, "LastModified": 2**31 + 7, "Target": plistlib.UID(2)},
+        "Фото/ссылка",
+    )
+    assert extract_metadata(blob) == (5 * 2**40, 2**31 + 7, "Фото/ссылка")
+
+
+def test_missing_properties():
+    blob = archive_blob({"Mode": 16877})
+    assert extract_metadata(blob) == (None, None, None)
+
+
+def test_many_objects_and_long_keys():
+    properties = {f"LongPropertyName{i}": i for i in range(300)}
+    properties["LastModified"] = 1631511118
+    blob = archive_blob(properties)
+    assert extract_metadata(blob) == (None, 1631511118, None)
+
+
+@pytest.mark.parametrize("blob", [
+    b"",
+    b"not a plist at all, just some bytes to fill the trailer",
+    plistlib.dumps({"Name": "example"}, fmt=plistlib.FMT_BINARY),
+    plistlib.dumps({"$objects": ["$null"]}, fmt=plistlib.FMT_BINARY),
+    archive_blob({"Size": 1})[:-40] + archive_blob({"Size": 1})[-32:],
+    archive_blob({"Size": 1})[:-8] + b"\xff" * 8,  # Offset table beyond ssize_t.
+])
+def test_invalid_blob(blob):
+    with pytest.raises(ValueError):
+        extract_metadata(blob)
@@ -1,9 +1,20 @@
+import os
+import stat
 from pathlib import Path
+from typing import NamedTuple
 
-from ios_backup.__main__ import build_parser, handle_export, export
+import pytest
 
+from ios_backup.__main__ import handle_export, export
 
-def test_cli_arguments(monkeypatch, tmp_path):
+
+# Paths for tests which only pass them through, nothing is created there.
+BACKUP_PATH = '/fake/backup'
+OUTPUT_PATH = '/fake/out'
+
+
+@pytest.mark.fastcli
+def test_cli_arguments(monkeypatch, cli_parser):
     """Ensure values parsed by build_parser() are passed to export().
 
     This test parses a realistic `export` command line then replaces the real
@@ -28,12 +39,10 @@ def test_cli_arguments(monkeypatch, tmp_path):
     # Monkeypatch the export() function in the cli module so we can inspect the call.
     monkeypatch.setattr('ios_backup.__main__.export', mock_export)
 
-    parser = build_parser()
-
     argv = [
         'export',
-        str(tmp_path / 'some_backup'),
-        str(tmp_path / 'out'),
+        BACKUP_PATH,
+        OUTPUT_PATH,
         '--domain', 'AppDomain',
         '--namespace', 'com.example',
         '--path', 'docs',
@@ -42,7 +51,7 @@ def test_cli_arguments(monkeypatch, tmp_path):
         '--restore-symlinks',
     ]
 
-    args = parser.parse_args(argv)
+    args = cli_parser.parse_args(argv)
 
     # Run the handler - this should call our fake_export and populate `captured`.
     # If the handler expects different attribute names, this will raise AttributeError
@@ -50,78 +59,95 @@ def test_cli_arguments(monkeypatch, tmp_path):
     handle_export(args)
 
     # Verify all parsed values were passed into export() by the handler
-    assert captured['backup_path'] == str(tmp_path / 'some_backup')
-    assert captured['output_path'] == str(tmp_path / 'out')
-    assert captured['domain_prefix'] == 'AppDomain'
-    assert captured['namespace_prefix'] == 'com.example'
-    assert captured['path_prefix'] == 'docs'
-    assert captured['ignore_missing'] is True
-    assert captured['restore_modified_dates'] is True
-    assert captured['restore_symlinks'] is True
+    assert captured == {
+        'backup_path': BACKUP_PATH,
+        'output_path': OUTPUT_PATH,
+        'domain_prefix': 'AppDomain',
+        'namespace_prefix': 'com.example',
+        'path_prefix': 'docs',
+        'ignore_missing': True,
+        'restore_modified_dates': True,
+        'restore_symlinks': True,
+    }
 
 
-def test_export_real_backup(tmp_path):
-    """Test export function with a real backup structure and plist files."""
+class DirExpect(NamedTuple):
+    dst: str
+    mtime: int
+
+
+class FileExpect(NamedTuple):
+    src: str
+    dst: str
+    mtime: int
+
+
+class SymlinkExpect(NamedTuple):
+    dst: str
+    target: str
+    mtime: int
+
+
+# Expected entries of the exported sample backup.
+EXPECTED_ITEMS = [
+    DirExpect('AppDomain/com.google.Translate', 1631511118),
+    DirExpect('AppDomain/com.google.Translate/Documents', 1634003864),
+    DirExpect('AppDomain/com.google.Translate/Library', 1631511122),
+    DirExpect('AppDomain/com.google.Translate/Library/Preferences', 1682109153),
+    FileExpect('tests/data/sample_backup/12/12e90d5b620bbdeaaa88de34607ebf880fa708f5',
+               'AppDomain/com.google.Translate/Library/Preferences/com.google.Translate.plist',
+               1682109153),
+    SymlinkExpect('DatabaseDomain/timezone/localtime', '', 1687838382),
+]
+
+
+@pytest.fixture(scope="session")
+def exported_backup(tmp_path_factory):
+    """Export the sample backup once, for all tests checking its entries."""
 
-    export_path = tmp_path / 'exported'
+    export_path = tmp_path_factory.mktemp('exported')
 
     export('tests/data/sample_backup', str(export_path),
            domain_prefix='', namespace_prefix='', path_prefix='',
            ignore_missing=False, restore_modified_dates=True, restore_symlinks=True)
 
-    # Verify that expected entries were exported.
-    expected_items = [
-        {
-            'type': 'directory',
-            'dst': 'AppDomain/com.google.Translate',
-            'mtime': 1631511118,
-        },
-        {
-            'type': 'directory',
-            'dst': 'AppDomain/com.google.Translate/Documents',
-            'mtime': 1634003864,
-        },
-        {
-            'type': 'directory',
-            'dst': 'AppDomain/com.google.Translate/Library',
-            'mtime': 1631511122,
-        },
-        {
-            'type': 'directory',
-            'dst': 'AppDomain/com.google.Translate/Library/Preferences',
-            'mtime': 1682109153,
-        },
-        {
-            'type': 'file',
-            'src': 'tests/data/sample_backup/12/12e90d5b620bbdeaaa88de34607ebf880fa708f5',
-            'dst': 'AppDomain/com.google.Translate/Library/Preferences/com.google.Translate.plist',
-            'mtime': 1682109153,
-        },
-        {
-            'type': 'symlink',
-            'dst': 'DatabaseDomain/timezone/localtime',
-            'target': '',
-            'mtime': 1687838382,
-        },
-    ]
+    return export_path
+
+
+def _check_dir(item: DirExpect, dst: Path) -> os.stat_result:
+    st = os.stat(dst)
+    assert stat.S_ISDIR(st.st_mode), f"Expected exported directory {dst} does not exist."
+    return st
+
+
+def _check_file(item: FileExpect, dst: Path) -> os.stat_result:
+    st = os.stat(dst)
+    assert stat.S_ISREG(st.st_mode), f"Expected exported file {dst} does not exist."
+    assert dst.read_bytes() == Path(item.src).read_bytes(), f"Exported file {dst} content mismatch."
+    return st
+
+
+def _check_symlink(item: SymlinkExpect, dst: Path) -> os.stat_result:
+    st = os.stat(dst, follow_symlinks=False)
+    assert stat.S_ISLNK(st.st_mode), f"Expected exported symlink {dst} does not exist."
+    return st
+
+
+# Each check stats the entry once and returns the result for the common assertions.
+_CHECKERS = {
+    DirExpect: _check_dir,
+    FileExpect: _check_file,
+    SymlinkExpect: _check_symlink,
+}
+
+
+@pytest.mark.realio
+@pytest.mark.parametrize('item', EXPECTED_ITEMS, ids=lambda item: item.dst)
+def test_export_real_backup(exported_backup, item):
+    """Test export function with a real backup structure and plist files."""
+
+    dst = exported_backup / item.dst
+    st = _CHECKERS[type(item)](item, dst)
 
-    for item in expected_items:
-        if item['type'] == 'directory':
-            dst = export_path / item['dst']
-            assert dst.exists() and dst.is_dir(), f"Expected exported directory {dst} does not exist."  
-            if item['mtime']:
-                assert dst.stat().st_mtime == item['mtime']
-
-        elif item['type'] == 'file':
-            src = Path(item['src'])
-            dst = export_path / item['dst']
-            assert dst.exists() and dst.is_file(), f"Expected exported file {dst} does not exist."
-            assert dst.read_bytes() == src.read_bytes(), f"Exported file {dst} content mismatch."
-            if item['mtime']:
-                assert dst.stat().st_mtime == item['mtime']
-
-        elif item['type'] == 'symlink':
-            dst = export_path / item['dst']
-            assert dst.exists(follow_symlinks=False) and dst.is_symlink(), f"Expected exported symlink {dst} does not exist."
-            if item['mtime']:
-                assert dst.stat(follow_symlinks=False).st_mtime == item['mtime']
+    if item.mtime:
+        assert st.st_mtime == item.mtime
@@ -3,68 +3,121 @@ from ios_backup.db import QueryBuilder
 
 
 def test_content_query_all():
-    query = QueryBuilder.content()
+    query, params = QueryBuilder.content()
     expected_query = """
             SELECT fileID, domain, relativePath, flags, file
             FROM Files
             WHERE 1 = 1
         """
     assert query.strip() == expected_query.strip()
+    assert params == ()
 
 
 def test_content_query_domain():
     domain = generate_random_string(10)
-    query = QueryBuilder.content(domain)
+    query, params = QueryBuilder.content(domain)
     expected_query = f"""
             SELECT fileID, domain, relativePath, flags, file
             FROM Files
-            WHERE 1 = 1 AND domain LIKE '{domain}%'
+            WHERE 1 = 1 AND domain >= ? AND domain < ?
         """
     assert normalize_whitespace(query) == normalize_whitespace(expected_query)
+    assert params == (domain, domain[:-1] + chr(ord(domain[-1]) + 1))
 
 
 def test_content_query_namespace():
     namespace = generate_random_string(15)
-    query = QueryBuilder.content(namespace)
+    query, params = QueryBuilder.content(namespace_prefix=namespace)
     expected_query = f"""
             SELECT fileID, domain, relativePath, flags, file
             FROM Files
-            WHERE 1 = 1 AND domain LIKE '{namespace}%'
+            WHERE 1 = 1 AND instr(domain, '-') > 0
+              AND substr(domain, instr(domain, '-') + 1) >= ?
+              AND substr(domain, instr(domain, '-') + 1) < ?
         """
     assert normalize_whitespace(query) == normalize_whitespace(expected_query)
+    assert params == (namespace, namespace[:-1] + chr(ord(namespace[-1]) + 1))
 
 
 def test_content_query_domain_and_namespace():
     domain = generate_random_string(10)
     namespace = generate_random_string(15)
-    query = QueryBuilder.content(domain, namespace)
+    query, params = QueryBuilder.content(domain, namespace)
     expected_query = f"""
             SELECT fileID, domain, relativePath, flags, file
             FROM Files
-            WHERE 1 = 1 AND domain LIKE '{domain}%-{namespace}%'
+            WHERE 1 = 1 AND domain >= ? AND domain < ? AND instr(domain, '-') > 0
+              AND substr(domain, instr(domain, '-') + 1) >= ?
+              AND substr(domain, instr(domain, '-') + 1) < ?
         """
     assert normalize_whitespace(query) == normalize_whitespace(expected_query)
+    assert params[0::2] == (domain, namespace)
 
 
 def test_content_query_path():
     path = generate_random_string(20)
-    query = QueryBuilder.content(path_prefix=path)
+    query, params = QueryBuilder.content(path_prefix=path)
     expected_query = f"""
             SELECT fileID, domain, relativePath, flags, file
             FROM Files
-            WHERE 1 = 1 AND relativePath LIKE '{path}%'
+            WHERE 1 = 1 AND relativePath >= ? AND relativePath < ?
         """
     assert normalize_whitespace(query) == normalize_whitespace(expected_query)
+    assert params == (path, path[:-1] + chr(ord(path[-1]) + 1))
 
 
 def test_content_query_domain_and_namespace_and_path():
     domain = generate_random_string(10)
     namespace = generate_random_string(15)
     path = generate_random_string(20)
-    query = QueryBuilder.content(domain, namespace, path)
+    query, params = QueryBuilder.content(domain, namespace, path)
     expected_query = f"""
             SELECT fileID, domain, relativePath, flags, file
             FROM Files
-            WHERE 1 = 1 AND domain LIKE '{domain}%-{namespace}%' AND relativePath LIKE '{path}%'
+            WHERE 1 = 1 AND domain >= ? AND domain < ? AND instr(domain, '-') > 0
+              AND substr(domain, instr(domain, '-') + 1) >= ?
+              AND substr(domain, instr(domain, '-') + 1) < ?
+              AND relativePath >= ? AND relativePath < ?
         """
     assert normalize_whitespace(query) == normalize_whitespace(expected_query)
+    assert params[0::2] == (domain, namespace, path)
+
+
+def test_content_query_does_not_interpolate_values():
+    query, params = QueryBuilder.content("App'Domain", "com.%", "docs_")
+    assert "App'Domain" not in query
+    assert "com.%" not in query
+    assert params[0::2] == ("App'Domain", "com.%", "docs_")
+
+
+def test_content_query_order_by_file_id():
+    query, params = QueryBuilder.content(path_prefix="docs", order_by_file_id=True)
+    expected_query = f"""
+            SELECT fileID, domain, relativePath, flags, file
+            FROM Files
+            WHERE 1 = 1 AND relativePath >= ? AND relativePath < ?
+            ORDER BY fileID
+        """
+    assert normalize_whitespace(query) == normalize_whitespace(expected_query)
+
+
+def test_content_query_prefix_at_max_character():
+    # Trailing U+10FFFF is dropped, and the previous character incremented.
+    _, params = QueryBuilder.content(path_prefix="docs\U0010ffff\U0010ffff")
+    assert params == ("docs\U0010ffff\U0010ffff", "doct")
+
+    # Surrogates are skipped.
+    _, params = QueryBuilder.content(path_prefix="docs\ud7ff")
+    assert params == ("docs\ud7ff", "docs\ue000")
+
+
+def test_content_query_prefix_without_upper_bound():
+    path = "\U0010ffff"
+    query, params = QueryBuilder.content(path_prefix=path)
+    expected_query = f"""
+            SELECT fileID, domain, relativePath, flags, file
+            FROM Files
+            WHERE 1 = 1 AND relativePath >= ?
+        """
+    assert normalize_whitespace(query) == normalize_whitespace(expected_query)
+    assert params == (path,)
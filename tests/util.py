@@ -1,14 +1,15 @@
 import random
 import string
-import re
+
+
+_ALPHANUM = string.ascii_letters + string.digits
 
 
 def generate_random_string(length):
     """Generates a random string of a given length."""
-    characters = string.ascii_letters + string.digits
-    return ''.join(random.choice(characters) for _ in range(length))
+    return ''.join(random.choices(_ALPHANUM, k=length))
 
 
 def normalize_whitespace(s: str) -> str:
     """Normalize whitespace in a string for comparison."""
-    return re.sub(r'\s+', ' ', s).strip()
+    return ' '.join(s.split())